@@ -0,0 +1,123 @@
+"""
+Benchmark API throughput against the number of worker processes.
+
+Starts the server with the fake LLM (no Bedrock calls) for each worker count,
+fires concurrent /generate-article requests and reports requests per second,
+the speedup over the first worker count and the LLM call counters from
+/metrics. With --client-timeout, clients give up early, showing the calls
+saved by cancellation.
+
+The fake LLM does --cpu seconds of CPU work per call (thread CPU time) on top
+of --latency. Threads in one process share the GIL, so that work cannot
+overlap within a process and throughput scales with workers only up to the
+number of CPU cores; on a single core expect no speedup.
+
+Usage: python benchmark_workers.py [--workers 1 2 4] [--requests 16] [--latency 0.5] [--cpu 0.2] [--client-timeout 2]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def wait_for_server(base_url, timeout=60):
+    """Poll the health endpoint until the server is up"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+def send_request(base_url, index, client_timeout):
+    """Send one article request with a unique name so the cache is not hit"""
+    payload = {
+        "article_name": f"Benchmark Article {index} {uuid.uuid4().hex[:8]}",
+        "article_description": "A short guide to Python syntax, data types and simple examples."
+    }
+    try:
+        response = requests.post(f"{base_url}/generate-article", json=payload, timeout=client_timeout)
+    except requests.exceptions.Timeout:
+        # Client gave up; the server should notice and cancel the run
+        return False
+    return response.status_code == 200
+
+def run_benchmark(workers, total_requests, latency, cpu_seconds, port, client_timeout):
+    """Start the server with the given worker count and measure throughput"""
+    base_url = f"http://127.0.0.1:{port}"
+    store_dir = tempfile.mkdtemp(prefix="article_store_")
+    env = dict(
+        os.environ,
+        LLM_PROVIDER="fake",
+        FAKE_LLM_LATENCY=str(latency),
+        FAKE_LLM_CPU_SECONDS=str(cpu_seconds),
+        SHARED_STORE_PATH=os.path.join(store_dir, "store.sqlite3"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        if not wait_for_server(base_url):
+            print(f"❌ Server with {workers} worker(s) did not start")
+            return None
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=total_requests) as pool:
+            results = list(pool.map(lambda i: send_request(base_url, i, client_timeout), range(total_requests)))
+        duration = time.time() - start_time
+
+        # Let cancelled runs wind down before reading the counters
+        time.sleep(2 * latency + 1)
+        metrics = requests.get(f"{base_url}/metrics", timeout=10).json()
+
+        succeeded = sum(results)
+        throughput = succeeded / duration
+        print(f"   Workers: {workers:>2} | {succeeded}/{total_requests} ok | {duration:6.2f}s | {throughput:5.2f} req/s")
+        print(
+            f"   LLM calls started: {metrics.get('llm_calls_started', 0)}"
+            f" | completed: {metrics.get('llm_calls_completed', 0)}"
+            f" | aborted: {metrics.get('llm_calls_aborted', 0)}"
+            f" | avoided: {metrics.get('llm_calls_avoided', 0)}"
+            f" | disconnected requests: {metrics.get('requests_client_disconnected', 0)}"
+        )
+        return throughput
+    finally:
+        server.terminate()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark throughput against worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake LLM latency per call in seconds")
+    parser.add_argument("--cpu", type=float, default=0.2, help="Fake LLM CPU time per call in seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--client-timeout", type=float, default=300, help="Seconds before a client gives up on a request")
+    args = parser.parse_args()
+
+    print(f"🚀 Benchmarking /generate-article with the fake LLM ({os.cpu_count()} CPU cores)")
+    baseline = None
+    for workers in args.workers:
+        throughput = run_benchmark(workers, args.requests, args.latency, args.cpu, args.port, args.client_timeout)
+        if throughput and baseline is None:
+            baseline = throughput
+        if throughput and baseline:
+            print(f"   Speedup vs {args.workers[0]} worker(s): {throughput / baseline:.2f}x")
+
+if __name__ == "__main__":
+    main()
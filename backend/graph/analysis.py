@@ -0,0 +1,221 @@
+"""
+Cheap local quality checks that run before the LLM reflection step.
+
+These checks are deterministic and need no model call: markdown structure,
+truncation detection, length, readability and heading coverage of the
+description's keywords. When they fail badly the reflect node is skipped and
+the findings are fed straight back to the writer.
+"""
+import os
+import re
+import unicodedata
+from typing import List
+
+from .models import ArticleAnalysis
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+THEMATIC_BREAK_RE = re.compile(r"^([-*_])(\s*\1){2,}$")
+LIST_MARKER_RE = re.compile(r"^([-*+]|\d+[.)]|>)\s+")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+EMOTICON_RE = re.compile(r"[:;=8][-^']?[()\[\]]")
+WORD_RE = re.compile(r"[A-Za-z0-9']+")
+SENTENCE_SPLIT_RE = re.compile(r"[.!?]+(?:\s+|$)")
+CONCLUSION_RE = re.compile(
+    r"\b(conclusion|concluding|summary|final thoughts|wrapping up|wrap-up|takeaways?|next steps|closing thoughts)\b",
+    re.IGNORECASE,
+)
+
+# Lines ending with one of these are treated as complete
+TERMINAL_CHARS = (".", "!", "?", ":", ")", "\"", "'", "*", "_", "`", "|", ">")
+
+STOPWORDS = {
+    "about", "also", "among", "and", "been", "being", "both", "covering",
+    "cover", "covers", "detailed", "does", "each", "from", "guide", "have",
+    "into", "like", "more", "most", "other", "over", "should", "some",
+    "such", "than", "that", "their", "them", "then", "there", "these",
+    "they", "this", "those", "through", "using", "well", "what", "when",
+    "where", "which", "while", "will", "with", "within", "would", "your",
+    "article", "comprehensive", "including", "introduction", "basic",
+    "basics", "brief", "common", "simple", "various", "explain", "explains",
+}
+
+# Thresholds (overridable through environment variables)
+MIN_WORDS = int(os.getenv("ARTICLE_MIN_WORDS", "800"))
+MIN_SECTION_HEADINGS = int(os.getenv("ARTICLE_MIN_HEADINGS", "3"))
+MIN_KEYWORD_COVERAGE = float(os.getenv("ARTICLE_MIN_KEYWORD_COVERAGE", "0.3"))
+MIN_READING_EASE = float(os.getenv("ARTICLE_MIN_READING_EASE", "30"))
+MAX_AVG_SENTENCE_WORDS = float(os.getenv("ARTICLE_MAX_AVG_SENTENCE_WORDS", "28"))
+
+
+def _strip_code_blocks(lines: List[str]) -> List[str]:
+    """Return only the prose lines, dropping fenced code blocks"""
+    prose = []
+    in_fence = False
+    for line in lines:
+        if FENCE_RE.match(line):
+            in_fence = not in_fence
+            continue
+        if not in_fence:
+            prose.append(line)
+    return prose
+
+
+def _count_syllables(word: str) -> int:
+    """Rough English syllable count based on vowel groups"""
+    word = word.lower().strip("'")
+    if not word:
+        return 0
+    groups = re.findall(r"[aeiouy]+", word)
+    count = len(groups)
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+def _extract_keywords(description: str) -> List[str]:
+    """Pull distinct content words out of the article description"""
+    keywords = []
+    for word in WORD_RE.findall(description.lower()):
+        word = word.strip("'")
+        if len(word) < 4 or word in STOPWORDS or word.isdigit() or word in keywords:
+            continue
+        keywords.append(word)
+    return keywords
+
+
+def _stem(word: str) -> str:
+    """Very small suffix stripper so 'algorithms' matches 'algorithm'"""
+    for suffix in ("ing", "es", "s", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)]
+    return word
+
+
+def _last_content_line(lines: List[str]) -> str:
+    """Return the last non-empty line, skipping thematic breaks like ---"""
+    for line in reversed(lines):
+        line = line.strip()
+        if line and not THEMATIC_BREAK_RE.match(line):
+            return line
+    return ""
+
+
+def _looks_truncated(lines: List[str], unclosed_fence: bool) -> bool:
+    """Detect an article that stops mid-block (strong signals only)"""
+    if unclosed_fence:
+        return True
+    last = _last_content_line(lines)
+    if not last:
+        return True
+    if FENCE_RE.match(last):
+        # The article ends on a closed code block
+        return False
+    if HEADING_RE.match(last):
+        # A heading with no content after it
+        return True
+    if re.match(r"^([-*+]|\d+[.)])\s*$", last):
+        # Dangling list marker
+        return True
+    # Emoticons like :( are not open brackets
+    last = EMOTICON_RE.sub("", last)
+    return last.count("(") > last.count(")") or last.count("[") > last.count("]")
+
+
+def _ends_without_punctuation(lines: List[str]) -> bool:
+    """Whether the last line stops without terminal punctuation (weak signal)"""
+    last = _last_content_line(lines)
+    if FENCE_RE.match(last):
+        return False
+    last = LIST_MARKER_RE.sub("", last)
+    # Trailing emoji and other symbols ("Happy coding 🚀") count as an ending
+    if last and unicodedata.category(last[-1]) in ("So", "Sk", "Mn", "Cf"):
+        return False
+    return bool(last) and not last.endswith(TERMINAL_CHARS)
+
+
+def analyze_article(article: str, description: str, hit_token_limit: bool = False) -> ArticleAnalysis:
+    """
+    Run the local quality checks on an article and return the findings.
+    hit_token_limit is the writer's max_tokens stop signal, which is a
+    certain sign of truncation.
+    """
+    article = article or ""
+    lines = article.splitlines()
+
+    fence_count = sum(1 for line in lines if FENCE_RE.match(line))
+    unclosed_fence = fence_count % 2 == 1
+    prose_lines = _strip_code_blocks(lines)
+
+    headings = []
+    for line in prose_lines:
+        match = HEADING_RE.match(line.strip())
+        if match:
+            headings.append((len(match.group(1)), match.group(2)))
+    section_headings = [text for level, text in headings if level >= 2]
+
+    prose = "\n".join(line for line in prose_lines if not HEADING_RE.match(line.strip()))
+    words = WORD_RE.findall(prose)
+    word_count = len(words)
+    sentences = [s for s in SENTENCE_SPLIT_RE.split(prose) if WORD_RE.search(s)]
+    sentence_count = max(len(sentences), 1)
+    avg_sentence_words = word_count / sentence_count if word_count else 0.0
+    syllables = sum(_count_syllables(w) for w in words)
+    if word_count:
+        reading_ease = 206.835 - 1.015 * avg_sentence_words - 84.6 * (syllables / word_count)
+    else:
+        reading_ease = 0.0
+
+    keywords = _extract_keywords(description)
+    heading_words = {_stem(w) for text in section_headings for w in WORD_RE.findall(text.lower())}
+    missing_keywords = [k for k in keywords if _stem(k) not in heading_words]
+    coverage = 1.0 - len(missing_keywords) / len(keywords) if keywords else 1.0
+
+    truncated = hit_token_limit or _looks_truncated(lines, unclosed_fence)
+
+    critical: List[str] = []
+    issues: List[str] = []
+
+    if hit_token_limit:
+        critical.append("The article ran out of the output token budget before it was finished. Make it more concise so it fits.")
+    elif truncated:
+        critical.append("The article appears to be truncated - it ends mid-block. Make sure it is complete and ends with a proper conclusion.")
+    elif _ends_without_punctuation(lines):
+        issues.append("The last line has no closing punctuation; check that the article ends on a complete sentence.")
+    if unclosed_fence:
+        critical.append("A fenced code block is never closed; close every ``` block.")
+    if word_count < MIN_WORDS / 2:
+        critical.append(f"The article is far too short ({word_count} words); aim for at least {MIN_WORDS} words.")
+    elif word_count < MIN_WORDS:
+        issues.append(f"The article is shorter than the target length ({word_count} of {MIN_WORDS} words); expand the thinner sections.")
+    if not section_headings:
+        critical.append("The article has no section headings; structure it with ## headings.")
+    elif len(section_headings) < MIN_SECTION_HEADINGS:
+        issues.append(f"Only {len(section_headings)} section heading(s); break the content into at least {MIN_SECTION_HEADINGS} sections.")
+    if not any(level == 1 for level, _ in headings):
+        issues.append("Add a single top-level # title for the article.")
+    if not any(CONCLUSION_RE.search(text) for text in section_headings):
+        issues.append("Add a conclusion or summary section at the end of the article.")
+
+    prose_text = "\n".join(prose_lines)
+    if prose_text.count("**") % 2 == 1:
+        issues.append("Fix unbalanced bold markers (**) in the markdown.")
+    if re.search(r"\[[^\]\n]*\]\([^)\n]*$", prose_text, re.MULTILINE):
+        issues.append("Fix broken markdown links or images with a missing closing parenthesis.")
+
+    if word_count and reading_ease < MIN_READING_EASE:
+        issues.append(f"Readability is low (Flesch reading ease {reading_ease:.0f}); use shorter sentences and simpler words.")
+    if avg_sentence_words > MAX_AVG_SENTENCE_WORDS:
+        issues.append(f"Sentences average {avg_sentence_words:.0f} words; split long sentences.")
+    if keywords and coverage < MIN_KEYWORD_COVERAGE:
+        issues.append(f"Headings do not cover key topics from the description: {', '.join(missing_keywords[:6])}.")
+
+    return ArticleAnalysis(
+        word_count=word_count,
+        heading_count=len(section_headings),
+        reading_ease=round(reading_ease, 1),
+        keyword_coverage=round(coverage, 2),
+        truncated=truncated,
+        critical_issues=critical,
+        issues=issues,
+        passed=not critical,
+    )
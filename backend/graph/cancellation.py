@@ -0,0 +1,71 @@
+"""
+Cooperative cancellation for a running article generation.
+
+A CancellationToken is passed to the graph through the run config
+(config["configurable"]["cancel_token"]). Nodes and the streaming LLM helper
+check it before and during each model call and raise GenerationCancelled.
+While a model call runs, the token is also the active token of the current
+context, so code without access to the config (the rate limiter) can check it.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+class GenerationCancelled(Exception):
+    """Raised when a generation is cancelled or runs past its deadline"""
+
+class CancellationToken:
+    """
+    Cancellation flag with an optional deadline, safe to share across threads
+    """
+
+    def __init__(self, deadline_seconds: Optional[float] = None):
+        self.deadline = time.monotonic() + deadline_seconds if deadline_seconds else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline exceeded")
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise GenerationCancelled(self.reason)
+
+def get_cancel_token(config: Optional[RunnableConfig]) -> Optional[CancellationToken]:
+    """
+    Return the cancellation token from a run config, if one was provided
+    """
+    if not config:
+        return None
+    return config.get("configurable", {}).get("cancel_token")
+
+_active_token: ContextVar[Optional[CancellationToken]] = ContextVar("active_cancel_token", default=None)
+
+@contextmanager
+def active_cancel_token(token: Optional[CancellationToken]) -> Iterator[None]:
+    """
+    Make token the active cancellation token for the duration of the block
+    """
+    reset = _active_token.set(token)
+    try:
+        yield
+    finally:
+        _active_token.reset(reset)
+
+def get_active_cancel_token() -> Optional[CancellationToken]:
+    """
+    Return the cancellation token of the model call running in this context
+    """
+    return _active_token.get()
@@ -1,22 +1,53 @@
+from operator import itemgetter
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableLambda
 from .prompts import write_chain_prompt, reflect_chain_prompt
 from .models import WriteResponse, ReflectResponse
-from .helpers import get_chat_model
+from .helpers import get_chat_model, generate_with_continuation, MAX_OUTPUT_TOKENS, TRUNCATED_STOP_REASONS
+from .cancellation import get_cancel_token
 from .tools import fetch_readme, fetch_images
 
+def _close_truncated_json(text: str) -> str:
+    """
+    Close a JSON article response that ran out of budget mid-string so it
+    can still be parsed (the local analyzer will flag it as truncated)
+    """
+    stripped = text.rstrip()
+    # Drop a dangling escape character before closing the string
+    while stripped.endswith("\\"):
+        stripped = stripped[:-1]
+    return stripped + '"\n}'
+
 def write_chain():
     """
-    Create a write chain that can use tools and return structured output
+    Create a write chain that can use tools and return structured output.
+    The chain returns {"response": WriteResponse, "output_truncated": bool}.
     """
     llm = get_chat_model()
     
     # Create output parser for structured response
     output_parser = PydanticOutputParser(pydantic_object=WriteResponse)
     
+    def generate(prompt_value, config):
+        # Stream the article and continue it if it hits max_tokens
+        text, stop_reason = generate_with_continuation(
+            llm,
+            prompt_value.to_messages(),
+            on_chunk=lambda chunk: print(chunk, end="", flush=True),
+            cancel_token=get_cancel_token(config)
+        )
+        print()
+        output_truncated = stop_reason in TRUNCATED_STOP_REASONS
+        if output_truncated:
+            text = _close_truncated_json(text)
+        return {"text": text, "output_truncated": output_truncated}
+    
     # Create the chain without tool binding for now
     # Tools will be handled at the node level if needed
-    chain = write_chain_prompt | llm | output_parser
+    chain = write_chain_prompt | RunnableLambda(generate) | {
+        "response": itemgetter("text") | output_parser,
+        "output_truncated": itemgetter("output_truncated")
+    }
     return chain
 
 def reflect_chain():
@@ -28,5 +59,15 @@ def reflect_chain():
     # Create output parser for structured response
     output_parser = PydanticOutputParser(pydantic_object=ReflectResponse)
     
-    chain = reflect_chain_prompt | llm | output_parser
+    def generate(prompt_value, config):
+        # Stream a single call so a cancelled request can abort it mid-response
+        text, _ = generate_with_continuation(
+            llm,
+            prompt_value.to_messages(),
+            token_budget=MAX_OUTPUT_TOKENS,
+            cancel_token=get_cancel_token(config)
+        )
+        return text
+    
+    chain = reflect_chain_prompt | RunnableLambda(generate) | output_parser
     return chain
@@ -0,0 +1,70 @@
+"""
+Tracks every draft a graph run produces so the best one so far can be
+returned when a request is cancelled or hits its deadline.
+
+The tracker is shared between the thread running the graph and the request
+coroutine, which may stop waiting on the thread at the deadline.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+def _draft_rank(draft: Dict[str, Any]):
+    """
+    Drafts that failed the local checks rank lowest, drafts not yet checked
+    next, then drafts that passed; within a tier the review score decides
+    """
+    passed = draft["analysis_passed"]
+    tier = 0 if passed is False else 1 if passed is None else 2
+    score = draft["quality_score"] if passed and draft["quality_score"] is not None else 0
+    return (tier, score)
+
+def pick_best_draft(drafts: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the best ranked draft, preferring the latest on ties"""
+    if not drafts:
+        return None
+    return max(reversed(drafts), key=_draft_rank)
+
+class DraftTracker:
+    """
+    Thread-safe record of the graph state and each draft it produced
+    """
+
+    def __init__(self, initial_state: Dict[str, Any]):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = dict(initial_state)
+        self._drafts: List[Dict[str, Any]] = []
+
+    def record(self, node_name: str, update: Dict[str, Any]) -> None:
+        """Apply one node's state update"""
+        with self._lock:
+            self._state.update(update)
+            if node_name == "write":
+                self._drafts.append({
+                    "article_content": update["article_content"],
+                    "quality_score": None,
+                    "improvements": [],
+                    "analysis_passed": None
+                })
+            elif node_name == "analyze" and self._drafts:
+                draft = self._drafts[-1]
+                draft["analysis_passed"] = update.get("analysis_passed")
+                if not draft["analysis_passed"]:
+                    draft["quality_score"] = update.get("quality_score")
+                    draft["improvements"] = update.get("improvements", [])
+            elif node_name == "reflect" and self._drafts:
+                self._drafts[-1]["quality_score"] = update.get("quality_score")
+                self._drafts[-1]["improvements"] = update.get("improvements", [])
+
+    def state(self) -> Dict[str, Any]:
+        """Return a copy of the latest graph state"""
+        with self._lock:
+            return dict(self._state)
+
+    def best_state(self) -> Dict[str, Any]:
+        """Return the latest graph state with the best draft so far swapped in"""
+        with self._lock:
+            state = dict(self._state)
+            best = pick_best_draft(self._drafts)
+            if best:
+                state.update({key: best[key] for key in ("article_content", "quality_score", "improvements")})
+            return state
@@ -0,0 +1,104 @@
+"""
+Fake chat model for benchmarks and offline runs (LLM_PROVIDER=fake).
+
+It answers the write and reflect prompts with valid structured output after a
+configurable delay that stands in for Bedrock latency. Each call also does
+cpu_seconds of pure Python work (measured in CPU time of the calling thread),
+standing in for the per-request parsing and analysis work. Threads in one
+process share the GIL, so that work adds up across concurrent requests and
+only more worker processes (on more cores) can run it in parallel.
+"""
+import json
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+class FakeArticleModel(BaseChatModel):
+    """
+    Deterministic stand-in for ChatBedrock
+    """
+    latency: float = 0.5
+    cpu_seconds: float = 0.0
+    chunk_size: int = 200
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-article-model"
+
+    def _burn_cpu(self) -> None:
+        # Count this thread's CPU time, not wall time, so concurrent calls
+        # cannot finish together while waiting on each other for the GIL
+        deadline = time.thread_time() + self.cpu_seconds
+        total = 0
+        while time.thread_time() < deadline:
+            for i in range(1000):
+                total += i * i
+
+    def _build_article(self, system_prompt: str) -> str:
+        name_match = re.search(r"Article Name: (.+)", system_prompt)
+        description_match = re.search(r"Article Description: (.+)", system_prompt)
+        name = name_match.group(1).strip() if name_match else "Untitled"
+        description = description_match.group(1).strip() if description_match else name
+
+        paragraph = " ".join([
+            f"This section explains {name} in plain words.",
+            "Each idea builds on the one before it.",
+            "Short examples make the steps easy to follow.",
+            "Readers can try every step on their own machine.",
+            "The goal is to leave you ready to use it with confidence.",
+        ])
+        sections = [
+            f"## Overview: {description}",
+            "## Getting Started",
+            "## Core Concepts",
+            "## Practical Examples",
+            "## Best Practices",
+        ]
+        body = "\n\n".join(f"{heading}\n\n" + "\n\n".join([paragraph] * 4) for heading in sections)
+        return f"# {name}\n\n{body}\n\n## Conclusion\n\n{paragraph}\n"
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        system_prompt = messages[0].content if messages and isinstance(messages[0].content, str) else ""
+        if "content reviewer" in system_prompt:
+            return json.dumps({
+                "improvements": ["Add a worked example to the core concepts section"],
+                "overall_quality_score": 8,
+                "reasoning": "Fake review: well structured and complete."
+            })
+        return json.dumps({"article": self._build_article(system_prompt)})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        self._burn_cpu()
+        message = AIMessage(content=self._respond(messages), response_metadata={"stop_reason": "end_turn"})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self._burn_cpu()
+        text = self._respond(messages)
+        # Spread the latency over the chunks, like a real streamed response
+        chunk_count = max((len(text) + self.chunk_size - 1) // self.chunk_size, 1)
+        for start in range(0, len(text), self.chunk_size):
+            time.sleep(self.latency / chunk_count)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text[start:start + self.chunk_size]))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", response_metadata={"stop_reason": "end_turn"}))
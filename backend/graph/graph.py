@@ -1,21 +1,32 @@
 from langgraph.graph import START, END, StateGraph
 from typing import List
 
-from .nodes import write_node, reflect_node
+from .nodes import write_node, analyze_node, reflect_node
 from .state import MyState
 
+# Score at which an article is considered ready to publish
+QUALITY_THRESHOLD = 8
+
+# Maximum number of write iterations
+MAX_ITERATIONS = 3
+
 def should_continue(state: MyState) -> str:
     """Decide whether to continue improving or finish"""
     quality_score = state.get("quality_score", 0)
     iteration_count = state.get("iteration_count", 0)
     
-    # More permissive threshold for testing - stop if quality is 6+ or max iterations reached
-    # This accounts for token limitations during testing that may cause article truncation
-    if quality_score >= 6 or iteration_count >= 3:
+    # Stop if quality meets the threshold or max iterations reached
+    if quality_score >= QUALITY_THRESHOLD or iteration_count >= MAX_ITERATIONS:
         return "end"
     else:
         return "continue"
 
+def should_reflect(state: MyState) -> str:
+    """Skip the LLM reflection when the local checks already failed badly"""
+    if state.get("analysis_passed", True):
+        return "reflect"
+    return should_continue(state)
+
 def input_node(state: MyState):
     """Initialize the state with input data"""
     # This node just passes through the input state
@@ -32,6 +43,7 @@ graph_builder = StateGraph(MyState)
 # Add nodes
 graph_builder.add_node("input", input_node)
 graph_builder.add_node("write", write_node)
+graph_builder.add_node("analyze", analyze_node)
 graph_builder.add_node("reflect", reflect_node)
 
 # Set entry point
@@ -39,7 +51,18 @@ graph_builder.set_entry_point("input")
 
 # Add edges
 graph_builder.add_edge("input", "write")
-graph_builder.add_edge("write", "reflect")
+graph_builder.add_edge("write", "analyze")
+
+# Add conditional edge from analyze - only reflect when the local checks pass
+graph_builder.add_conditional_edges(
+    "analyze",
+    should_reflect,
+    {
+        "reflect": "reflect",  # Local checks passed, ask the LLM reviewer
+        "continue": "write",   # Local checks failed, rewrite straight away
+        "end": END             # Local checks failed but no iterations left
+    }
+)
 
 # Add conditional edge from reflect
 graph_builder.add_conditional_edges(
@@ -1,14 +1,39 @@
 import os
 from dotenv import load_dotenv
+from typing import Callable, List, Optional, Tuple
 from langchain_aws import ChatBedrock
+from langchain_core.messages import AIMessage, BaseMessage
+from .store import get_llm_rate_limiter, get_store
+from .cancellation import CancellationToken, GenerationCancelled, active_cancel_token
 
 # Load environment variables
 load_dotenv()
 
+# Output cap for a single model call
+MAX_OUTPUT_TOKENS = int(os.getenv("BEDROCK_MAX_TOKENS", "8000"))
+
+# Total output token budget for one article, including continuation calls
+# (the last call's max_tokens is capped to what is left)
+ARTICLE_TOKEN_BUDGET = int(os.getenv("ARTICLE_TOKEN_BUDGET", "24000"))
+
+# Stop reasons that mean the output was cut off by the token cap
+TRUNCATED_STOP_REASONS = {"max_tokens", "length"}
+
 def get_chat_model():
     """
     Create and return a configured ChatBedrock model instance
+    (or the fake model when LLM_PROVIDER=fake)
     """
+    rate_limiter = get_llm_rate_limiter()
+
+    if os.getenv("LLM_PROVIDER", "bedrock") == "fake":
+        from .fake_llm import FakeArticleModel
+        return FakeArticleModel(
+            latency=float(os.getenv("FAKE_LLM_LATENCY", "0.5")),
+            cpu_seconds=float(os.getenv("FAKE_LLM_CPU_SECONDS", "0")),
+            rate_limiter=rate_limiter
+        )
+
     model_id = os.getenv("BEDROCK_MODEL_ID")
     aws_region = os.getenv("AWS_REGION", "us-east-1")
     
@@ -19,8 +44,96 @@ def get_chat_model():
         model=model_id,
         region_name=aws_region,
         model_kwargs={
-            "max_tokens": 8000,  # Increased for better article completion
+            "max_tokens": MAX_OUTPUT_TOKENS,  # Longer articles are finished with continuation calls
             "temperature": 0.7
-        }
+        },
+        rate_limiter=rate_limiter
     )
     return llm
+
+def get_stop_reason(message: BaseMessage) -> Optional[str]:
+    """
+    Read the stop reason from a model response, if the provider reported one
+    """
+    metadata = getattr(message, "response_metadata", None) or {}
+    for key in ("stop_reason", "stopReason", "finish_reason"):
+        if metadata.get(key):
+            return metadata[key]
+    return None
+
+def generate_with_continuation(
+    llm,
+    messages: List[BaseMessage],
+    token_budget: int = ARTICLE_TOKEN_BUDGET,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Stream a response and keep going when it stops on the token cap.
+
+    Each continuation prefills the partial output as the assistant turn, so
+    the model appends to it instead of starting over. Every chunk, across
+    all calls, is passed to on_chunk. No more than token_budget output
+    tokens are requested in total. If cancel_token is cancelled, the
+    in-flight stream is closed and GenerationCancelled is raised.
+
+    Returns the output and the final stop reason; a stop reason in
+    TRUNCATED_STOP_REASONS means the budget ran out before the model finished.
+    """
+    store = get_store()
+    remaining = token_budget
+    output = ""
+    stop_reason = None
+    call = 0
+    while remaining > 0:
+        call += 1
+        if cancel_token and cancel_token.cancelled:
+            store.increment("llm_calls_avoided")
+            raise GenerationCancelled(cancel_token.reason)
+
+        call_messages = list(messages)
+        if output:
+            # Trailing whitespace is not allowed in a prefilled assistant turn
+            output = output.rstrip()
+            call_messages.append(AIMessage(content=output))
+
+        final = None
+        call_tokens = min(MAX_OUTPUT_TOKENS, remaining)
+        if call_tokens < MAX_OUTPUT_TOKENS:
+            # Last call: only ask for what is left of the budget
+            stream = llm.stream(call_messages, max_tokens=call_tokens)
+        else:
+            stream = llm.stream(call_messages)
+        started = False
+        try:
+            # The rate limiter runs on the first pull from the stream and
+            # checks the active token while it waits for a slot
+            with active_cancel_token(cancel_token):
+                for chunk in stream:
+                    if not started:
+                        # Counted once the call gets past the rate limiter
+                        store.increment("llm_calls_started")
+                        started = True
+                    if cancel_token and cancel_token.cancelled:
+                        store.increment("llm_calls_aborted")
+                        raise GenerationCancelled(cancel_token.reason)
+                    text = chunk.content if isinstance(chunk.content, str) else ""
+                    if text:
+                        output += text
+                        if on_chunk:
+                            on_chunk(text)
+                    final = chunk if final is None else final + chunk
+        finally:
+            # Closing the stream drops the connection to the model
+            stream.close()
+        store.increment("llm_calls_completed")
+        remaining -= call_tokens
+
+        stop_reason = get_stop_reason(final) if final is not None else None
+        if stop_reason not in TRUNCATED_STOP_REASONS:
+            break
+        if remaining <= 0:
+            print(f"\nOutput hit the token cap (call {call}), budget of {token_budget} tokens exhausted")
+        else:
+            print(f"\nOutput hit the token cap (call {call}), continuing")
+    return output, stop_reason
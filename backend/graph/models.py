@@ -16,3 +16,16 @@ class ReflectResponse(BaseModel):
     improvements: List[str] = Field(description="List of specific improvements suggested for the article")
     overall_quality_score: int = Field(description="Quality score from 1-10, where 8+ means article is ready")
     reasoning: str = Field(description="Detailed reasoning for the improvements and quality score")
+
+class ArticleAnalysis(BaseModel):
+    """
+    Findings from the local (non-LLM) pre-reflection checks.
+    """
+    word_count: int = Field(description="Number of prose words, excluding headings and code blocks")
+    heading_count: int = Field(description="Number of section headings (## and below)")
+    reading_ease: float = Field(description="Flesch reading ease of the prose")
+    keyword_coverage: float = Field(description="Fraction of description keywords that appear in section headings")
+    truncated: bool = Field(description="Whether the article appears to be cut off")
+    critical_issues: List[str] = Field(description="Issues severe enough to skip LLM reflection")
+    issues: List[str] = Field(description="Minor issues to pass on to the writer")
+    passed: bool = Field(description="False when there are critical issues")
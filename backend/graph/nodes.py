@@ -1,7 +1,12 @@
+from langchain_core.runnables import RunnableConfig
 from .state import MyState
 from .chains import write_chain, reflect_chain
+from .analysis import analyze_article
 
-def write_node(state: MyState):
+# Score assigned when the local checks fail badly and reflection is skipped
+FAILED_ANALYSIS_SCORE = 3
+
+def write_node(state: MyState, config: RunnableConfig):
     """Write agent node that generates or improves the article"""
     print("Entered write chain")
     chain = write_chain()
@@ -23,31 +28,68 @@ Please incorporate these improvements into your article.
         "article_description": state["article_description"],
         "iteration_count": state.get("iteration_count", 0),
         "improvements_context": improvements_context
-    })
-    print(response.article) 
+    }, config)
+    if response["output_truncated"]:
+        print("Article output ran out of the token budget")
+    
     # Update state with new article content
     return {
-        "article_content": response.article,
+        "article_content": response["response"].article,
+        "output_truncated": response["output_truncated"],
         "iteration_count": state.get("iteration_count", 0) + 1,
         "messages": state.get("messages", []) + [f"Article written/updated (iteration {state.get('iteration_count', 0) + 1})"]
     }
 
-def reflect_node(state: MyState):
+def analyze_node(state: MyState):
+    """Run cheap local quality checks before spending an LLM reflection call"""
+    print("Entered analyze node")
+    analysis = analyze_article(
+        state.get("article_content") or "",
+        state["article_description"],
+        hit_token_limit=state.get("output_truncated", False)
+    )
+    findings = analysis.critical_issues + analysis.issues
+    print(f"Local analysis findings: {findings}")
+
+    if analysis.passed:
+        return {
+            "analysis_issues": findings,
+            "analysis_passed": True,
+            "messages": state.get("messages", []) + [f"Local checks passed ({analysis.word_count} words, {len(analysis.issues)} minor issue(s))"]
+        }
+
+    # Critical failures: skip reflection and send the findings straight back to the writer
+    return {
+        "analysis_issues": findings,
+        "analysis_passed": False,
+        "improvements": findings,
+        "quality_score": FAILED_ANALYSIS_SCORE,
+        "messages": state.get("messages", []) + [f"Local checks failed ({len(analysis.critical_issues)} critical issue(s)) - skipping reflection"]
+    }
+
+def reflect_node(state: MyState, config: RunnableConfig):
     """Reflect agent node that analyzes the article and suggests improvements"""
     print("Entered reflect chain")
     chain = reflect_chain()
     
+    analysis_issues = state.get("analysis_issues", [])
+    if analysis_issues:
+        analysis_context = "Automated checks already flagged these issues (no need to repeat them):\n" + "\n".join([f"- {issue}" for issue in analysis_issues])
+    else:
+        analysis_context = "Automated checks found no mechanical issues."
+
     # Invoke the reflection chain
     response = chain.invoke({
         "article_content": state["article_content"],
         "article_name": state["article_name"],
-        "article_description": state["article_description"]
-    })
+        "article_description": state["article_description"],
+        "analysis_context": analysis_context
+    }, config)
     
     # Update state with reflection results
     print(f"The improvements are \n\n {response.improvements}")
     return {
-        "improvements": response.improvements,
+        "improvements": analysis_issues + response.improvements,
         "quality_score": response.overall_quality_score,
         "messages": state.get("messages", []) + [f"Article reviewed - Quality Score: {response.overall_quality_score}/10"]
     }
@@ -37,28 +37,26 @@ Write the complete article now:"""),
 reflect_chain_prompt = ChatPromptTemplate.from_messages([
     ("system", """You are an expert content reviewer and editor. Your task is to carefully analyze the provided article and suggest specific improvements.
 
-IMPORTANT: This system is in testing mode. Be more lenient with scoring, especially if the article appears to be cut off due to token limitations. Focus on the quality of the content that IS present rather than penalizing for incompleteness.
-
 Evaluate the article on these criteria:
 1. Content quality and accuracy
 2. Structure and organization
 3. Clarity and readability
-4. Completeness and depth (be lenient if article seems truncated)
+4. Completeness and depth
 5. Engagement and flow
 6. Technical accuracy (if applicable)
 7. Grammar and style
 
 Scoring Guidelines:
-- Score 6-7: Good content with minor issues or appears truncated but has solid foundation
+- Score 6-7: Good content with minor issues
 - Score 8-10: Excellent content that's comprehensive and well-written
 - Score 4-5: Needs significant improvement
 - Score 1-3: Major issues requiring complete rewrite
 
-If the article appears to be cut off or incomplete due to token limits, focus your evaluation on the content that IS present and be more forgiving in your scoring.
+Long articles are completed with continuation calls, so an article that is cut off or incomplete is a real defect and should be scored accordingly.
 
 Provide:
 - Specific, actionable improvements
-- A quality score from 1-10 (where 6+ is acceptable for testing)
+- A quality score from 1-10 (where 8+ means the article is ready to publish)
 - Detailed reasoning for your assessment
 
 Be constructive and specific in your feedback. Focus on what would make the article more valuable to readers.
@@ -69,6 +67,8 @@ Article to review:
 Article Name: {article_name}
 Article Description: {article_description}
 
+{analysis_context}
+
 {format_instructions}"""),
     ("human", "Please analyze this article and provide your feedback.")
 ]).partial(format_instructions=reflect_output_parser.get_format_instructions())
@@ -8,7 +8,12 @@ class MyState(TypedDict):
     
     # Content fields
     article_content: Optional[str]
+    output_truncated: bool
     
+    # Local pre-reflection check results
+    analysis_issues: List[str]
+    analysis_passed: bool
+
     # Workflow tracking
     improvements: List[str]
     quality_score: Optional[int]
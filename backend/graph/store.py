@@ -0,0 +1,359 @@
+"""
+Shared state for running the API with several worker processes.
+
+Job state, the response cache and rate-limit budgets live in a single SQLite
+database in WAL mode, so every uvicorn/gunicorn worker on the host sees the
+same data without an external service.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+from .cancellation import CancellationToken, GenerationCancelled, get_active_cancel_token
+
+STORE_PATH = os.getenv("SHARED_STORE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "article_store.sqlite3"))
+
+# Seconds a cached article stays valid (0, the default, disables the
+# response cache so every request generates a fresh article)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "0"))
+
+# The owner of a running job refreshes its updated_at this often
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "5"))
+
+# A running job without a heartbeat for this long is treated as abandoned
+JOB_STALE_AFTER = int(os.getenv("JOB_STALE_AFTER", "30"))
+
+# Shared LLM call budget across all workers (0 means unlimited)
+LLM_CALLS_PER_MINUTE = int(os.getenv("LLM_CALLS_PER_MINUTE", "0"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    cache_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    worker_pid INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_cache_key ON jobs (cache_key, status);
+CREATE TABLE IF NOT EXISTS response_cache (
+    cache_key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rate_limit_events (
+    name TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rate_limit_events_name ON rate_limit_events (name, created_at);
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Whether a worker process on this host is still running"""
+    if not pid or os.name != "posix":
+        # os.kill(pid, 0) would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class SharedStore:
+    """
+    SQLite (WAL) backed store shared by all worker processes
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A fresh connection per operation keeps this safe across threads and forks
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        """Build a stable cache key from the request fields"""
+        raw = json.dumps([p or "" for p in parts])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # Response cache
+
+    def get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        if RESPONSE_CACHE_TTL <= 0:
+            return None
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM response_cache WHERE cache_key = ? AND expires_at > ?",
+                (cache_key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def cache_response(self, cache_key: str, payload: Dict[str, Any]) -> None:
+        if RESPONSE_CACHE_TTL <= 0:
+            return
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, payload, expires_at) VALUES (?, ?, ?)",
+                (cache_key, json.dumps(payload), time.time() + RESPONSE_CACHE_TTL)
+            )
+        finally:
+            conn.close()
+
+    # Job state
+
+    def claim_job(self, cache_key: str) -> Tuple[str, bool]:
+        """
+        Register a job for cache_key. Returns (job_id, owner); owner is False
+        when another worker is already generating the same article.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Drop finished jobs nobody can still be waiting on
+            conn.execute(
+                "DELETE FROM jobs WHERE status != 'running' AND updated_at < ?",
+                (now - JOB_STALE_AFTER,)
+            )
+            row = conn.execute(
+                "SELECT id, worker_pid FROM jobs WHERE cache_key = ? AND status = 'running' AND updated_at > ?",
+                (cache_key, now - JOB_STALE_AFTER)
+            ).fetchone()
+            if row and _pid_alive(row[1]):
+                conn.execute("COMMIT")
+                return row[0], False
+            if row:
+                # The owning worker died mid-job; take the job over
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'worker exited', updated_at = ? WHERE id = ?",
+                    (now, row[0])
+                )
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO jobs (id, cache_key, status, worker_pid, created_at, updated_at) VALUES (?, ?, 'running', ?, ?, ?)",
+                (job_id, cache_key, os.getpid(), now, now)
+            )
+            conn.execute("COMMIT")
+            return job_id, True
+        except Exception:
+            # Only roll back if BEGIN IMMEDIATE actually started a transaction
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def finish_job(self, job_id: str, result: Dict[str, Any], partial: bool = False) -> None:
+        """
+        Publish a job's result to waiting workers. A partial result (best
+        draft at a deadline) is shared with waiters but never cached.
+        """
+        self._update_job(job_id, "partial" if partial else "done", result=json.dumps(result))
+
+    def fail_job(self, job_id: str, error: str) -> None:
+        self._update_job(job_id, "failed", error=error)
+
+    def touch_job(self, job_id: str) -> None:
+        """Heartbeat from the owner so waiters know the job is still alive"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = 'running'",
+                (time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    async def heartbeat(self, job_id: str) -> None:
+        """Keep a running job fresh until this task is cancelled"""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            await asyncio.to_thread(self.touch_job, job_id)
+
+    def _update_job(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id)
+            )
+        finally:
+            conn.close()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT status, result, error, updated_at, worker_pid FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        if not row:
+            return None
+        return {
+            "status": row[0],
+            "result": json.loads(row[1]) if row[1] else None,
+            "error": row[2],
+            "updated_at": row[3],
+            "worker_pid": row[4],
+        }
+
+    async def wait_for_job(self, job_id: str, poll_interval: float = 0.5, cancel_token: Optional[CancellationToken] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a job owned by another worker. Returns its result (full or
+        partial), or None if it failed, was abandoned (owner process gone or
+        no heartbeat) or cancel_token was cancelled first.
+        """
+        while True:
+            job = await asyncio.to_thread(self.get_job, job_id)
+            if not job or job["status"] == "failed":
+                return None
+            if job["status"] in ("done", "partial"):
+                return job["result"]
+            if job["updated_at"] < time.time() - JOB_STALE_AFTER or not _pid_alive(job["worker_pid"]):
+                return None
+            if cancel_token and cancel_token.cancelled:
+                return None
+            await asyncio.sleep(poll_interval)
+
+    # Metrics
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Add to a counter shared by all workers"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO metrics (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount)
+            )
+        finally:
+            conn.close()
+
+    def get_metrics(self) -> Dict[str, int]:
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT name, value FROM metrics ORDER BY name").fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    # Rate limiting
+
+    def try_acquire(self, name: str, limit: int, window: float = 60.0) -> bool:
+        """Take one slot from a sliding-window budget shared by all workers"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM rate_limit_events WHERE name = ? AND created_at <= ?",
+                (name, now - window)
+            )
+            (used,) = conn.execute(
+                "SELECT COUNT(*) FROM rate_limit_events WHERE name = ?",
+                (name,)
+            ).fetchone()
+            acquired = used < limit
+            if acquired:
+                conn.execute(
+                    "INSERT INTO rate_limit_events (name, created_at) VALUES (?, ?)",
+                    (name, now)
+                )
+            conn.execute("COMMIT")
+            return acquired
+        except Exception:
+            # Only roll back if BEGIN IMMEDIATE actually started a transaction
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+class SharedRateLimiter(BaseRateLimiter):
+    """
+    LangChain rate limiter backed by the shared store, so the budget holds
+    across every worker process rather than per process. A call whose
+    generation is cancelled while it waits for a slot is dropped with
+    GenerationCancelled.
+    """
+
+    def __init__(self, store: SharedStore, name: str, limit: int, window: float = 60.0, check_every: float = 0.1):
+        self.store = store
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.check_every = check_every
+
+    def _raise_if_cancelled(self) -> None:
+        cancel_token = get_active_cancel_token()
+        if cancel_token and cancel_token.cancelled:
+            self.store.increment("llm_calls_avoided")
+            raise GenerationCancelled(cancel_token.reason)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        self._raise_if_cancelled()
+        while not self.store.try_acquire(self.name, self.limit, self.window):
+            if not blocking:
+                return False
+            time.sleep(self.check_every)
+            self._raise_if_cancelled()
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        self._raise_if_cancelled()
+        while not await asyncio.to_thread(self.store.try_acquire, self.name, self.limit, self.window):
+            if not blocking:
+                return False
+            await asyncio.sleep(self.check_every)
+            self._raise_if_cancelled()
+        return True
+
+_store: Optional[SharedStore] = None
+
+def get_store() -> SharedStore:
+    """
+    Return the process-wide SharedStore, creating it on first use
+    """
+    global _store
+    if _store is None:
+        _store = SharedStore()
+    return _store
+
+def get_llm_rate_limiter() -> Optional[SharedRateLimiter]:
+    """
+    Return the shared LLM call limiter, or None when no budget is configured
+    """
+    if LLM_CALLS_PER_MINUTE <= 0:
+        return None
+    return SharedRateLimiter(get_store(), "llm_calls", LLM_CALLS_PER_MINUTE)
@@ -1,10 +1,12 @@
 """
 FastAPI application for the Article Writing System
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import List, Optional
+import asyncio
+import time
 import uvicorn
 import os
 from dotenv import load_dotenv
@@ -12,8 +14,22 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from graph.graph import graph
+from graph.graph import graph, QUALITY_THRESHOLD, MAX_ITERATIONS
 from graph.state import MyState
+from graph.store import get_store
+from graph.cancellation import CancellationToken, GenerationCancelled
+from graph.drafts import DraftTracker
+
+# Deadline applied when a request does not set one, just under the 120 s
+# client timeouts (0 disables it)
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("DEFAULT_DEADLINE_SECONDS", "115"))
+
+# How often to check whether the client is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+
+# Extra time a waiting request gives an identical in-flight request to
+# publish its best draft once their shared deadline has passed
+WAITER_GRACE_SECONDS = float(os.getenv("WAITER_GRACE_SECONDS", "2"))
 
 app = FastAPI(
     title="Article Writing System API",
@@ -36,6 +52,7 @@ class ArticleRequest(BaseModel):
     article_description: str = Field(..., description="Detailed description of what the article should cover")
     doc_path: Optional[str] = Field(None, description="Optional path to README file for context")
     image_folder_path: Optional[str] = Field(None, description="Optional path to images folder")
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=600, description="Optional time budget in seconds; the best draft so far is returned when it runs out")
 
 class ArticleResponse(BaseModel):
     article_content: str = Field(..., description="The generated article content in markdown format")
@@ -44,6 +61,7 @@ class ArticleResponse(BaseModel):
     improvements: List[str] = Field(..., description="List of improvements suggested (if any)")
     messages: List[str] = Field(..., description="Workflow messages for debugging")
     success: bool = Field(..., description="Whether the generation was successful")
+    deadline_exceeded: bool = Field(False, description="Whether the deadline cut generation short and the best draft so far was returned")
 
 class HealthResponse(BaseModel):
     status: str
@@ -72,8 +90,46 @@ async def health_check():
             message=f"System error: {str(e)}"
         )
 
+async def wait_until_done_or_cancelled(task: "asyncio.Future", http_request: Request, cancel_token: CancellationToken) -> bool:
+    """
+    Wait for task until it finishes, the client disconnects or the token's
+    deadline passes. Returns False if the wait was cut short; the token is
+    then cancelled so the task can wind down on its own.
+    """
+    while not task.done():
+        if cancel_token.cancelled:
+            return False
+        timeout = DISCONNECT_POLL_INTERVAL
+        if cancel_token.deadline is not None:
+            timeout = max(min(timeout, cancel_token.deadline - time.monotonic()), 0)
+        await asyncio.wait({task}, timeout=timeout)
+        if not task.done() and not cancel_token.cancelled and await http_request.is_disconnected():
+            cancel_token.cancel("client disconnected")
+    return True
+
+def _discard_result(task: "asyncio.Future") -> None:
+    # Runs abandoned at the deadline finish in the background; drop their outcome
+    if not task.cancelled():
+        task.exception()
+
+def run_graph(initial_state: MyState, cancel_token: CancellationToken, tracker: DraftTracker) -> Optional[str]:
+    """
+    Run the workflow, recording every update in tracker so the best draft
+    so far is available if the run is cancelled. Returns the cancel reason,
+    or None if the run finished.
+    """
+    config = {"configurable": {"cancel_token": cancel_token}}
+    try:
+        for update in graph.stream(initial_state, config=config, stream_mode="updates"):
+            for node_name, node_update in update.items():
+                if node_update:
+                    tracker.record(node_name, node_update)
+        return None
+    except GenerationCancelled:
+        return cancel_token.reason
+
 @app.post("/generate-article", response_model=ArticleResponse)
-async def generate_article(request: ArticleRequest):
+async def generate_article(request: ArticleRequest, http_request: Request):
     """
     Generate an article using the Write-Reflect workflow
     
@@ -82,6 +138,9 @@ async def generate_article(request: ArticleRequest):
     2. Uses the Write agent to generate content (with optional tools)
     3. Uses the Reflect agent to review and suggest improvements
     4. Iterates until quality threshold is met or max iterations reached
+    
+    Generation stops when the client disconnects or the deadline passes; on a
+    deadline the best draft so far is returned.
     """
     # Input validation
     if not request.article_name.strip():
@@ -108,20 +167,99 @@ async def generate_article(request: ArticleRequest):
             detail="Article description must be less than 2000 characters"
         )
     
+    # Serve repeated requests from the response cache shared by all workers
+    store = get_store()
+    cache_key = store.make_key(
+        request.article_name.strip(),
+        request.article_description.strip(),
+        request.doc_path,
+        request.image_folder_path
+    )
+    cached = await asyncio.to_thread(store.get_cached_response, cache_key)
+    if cached:
+        return ArticleResponse(**cached)
+    
+    deadline = request.deadline_seconds or DEFAULT_DEADLINE_SECONDS
+    cancel_token = CancellationToken(deadline if deadline > 0 else None)
+    
+    # If another worker is already generating this article, wait for its result
+    job_id, owner = await asyncio.to_thread(store.claim_job, cache_key)
+    if not owner:
+        wait = asyncio.ensure_future(store.wait_for_job(job_id))
+        finished = await wait_until_done_or_cancelled(wait, http_request, cancel_token)
+        if not finished and cancel_token.reason != "client disconnected":
+            # The owner usually shares our deadline and publishes its best
+            # draft right as it passes, so give it a moment
+            try:
+                await asyncio.wait_for(asyncio.shield(wait), WAITER_GRACE_SECONDS)
+                finished = True
+            except asyncio.TimeoutError:
+                pass
+        if not finished:
+            wait.cancel()
+        shared_result = wait.result() if finished else None
+        if shared_result:
+            return ArticleResponse(**shared_result)
+        if cancel_token.reason == "client disconnected":
+            await asyncio.to_thread(store.increment, "requests_client_disconnected")
+            raise HTTPException(
+                status_code=499,
+                detail="Client disconnected - article generation cancelled"
+            )
+        if cancel_token.cancelled:
+            # No time left to start a run of our own
+            await asyncio.to_thread(store.increment, "requests_deadline_exceeded")
+            raise HTTPException(
+                status_code=504,
+                detail=f"Deadline of {deadline:g}s exceeded while waiting for an identical request"
+            )
+        job_id, owner = await asyncio.to_thread(store.claim_job, cache_key)
+    
+    # Heartbeat so waiting workers can tell this job is still alive
+    heartbeat = asyncio.ensure_future(store.heartbeat(job_id)) if owner else None
+    
     try:
         # Prepare initial state
         initial_state: MyState = {
             "article_name": request.article_name.strip(),
             "article_description": request.article_description.strip(),
             "article_content": None,
+            "output_truncated": False,
+            "analysis_issues": [],
+            "analysis_passed": True,
             "improvements": [],
             "quality_score": None,
             "iteration_count": 0,
             "messages": []
         }
         
-        # Run the article generation workflow
-        result = graph.invoke(initial_state)
+        # Run the article generation workflow in a thread so we can watch
+        # for client disconnects and enforce the deadline while it runs
+        tracker = DraftTracker(initial_state)
+        run = asyncio.ensure_future(asyncio.to_thread(run_graph, initial_state, cancel_token, tracker))
+        if await wait_until_done_or_cancelled(run, http_request, cancel_token):
+            cancel_reason = run.result()
+        else:
+            # Stop waiting now; the thread sees the cancelled token and stops
+            # at its next check
+            run.add_done_callback(_discard_result)
+            cancel_reason = cancel_token.reason
+        result = tracker.best_state() if cancel_reason else tracker.state()
+        
+        if cancel_reason == "client disconnected":
+            await asyncio.to_thread(store.increment, "requests_client_disconnected")
+            raise HTTPException(
+                status_code=499,
+                detail="Client disconnected - article generation cancelled"
+            )
+        if cancel_reason:
+            await asyncio.to_thread(store.increment, "requests_deadline_exceeded")
+            if not result.get("article_content"):
+                raise HTTPException(
+                    status_code=504,
+                    detail=f"Deadline of {deadline:g}s exceeded before a draft was produced"
+                )
+            result["messages"] = result.get("messages", []) + [f"Deadline of {deadline:g}s reached - returning best draft so far"]
         
         # Validate result
         if not result.get("article_content"):
@@ -130,26 +268,48 @@ async def generate_article(request: ArticleRequest):
                 detail="Article generation failed - no content produced"
             )
         
-        # Return the response
-        return ArticleResponse(
+        response = ArticleResponse(
             article_content=result.get("article_content", ""),
-            quality_score=result.get("quality_score", 0),
+            quality_score=result.get("quality_score") or 0,
             iteration_count=result.get("iteration_count", 0),
             improvements=result.get("improvements", []),
             messages=result.get("messages", []),
-            success=True
+            success=True,
+            deadline_exceeded=bool(cancel_reason)
         )
         
-    except HTTPException:
+        # Publish the result to the shared job state and cache; a partial
+        # draft is shared with waiting requests but not cached, so the next
+        # request gets a full run
+        if cancel_reason:
+            if owner:
+                await asyncio.to_thread(store.finish_job, job_id, response.model_dump(), True)
+        else:
+            if owner:
+                await asyncio.to_thread(store.finish_job, job_id, response.model_dump())
+            await asyncio.to_thread(store.cache_response, cache_key, response.model_dump())
+        await asyncio.to_thread(store.increment, "requests_completed")
+        
+        # Return the response
+        return response
+        
+    except HTTPException as e:
         # Re-raise HTTP exceptions
+        if owner:
+            await asyncio.to_thread(store.fail_job, job_id, str(e.detail))
         raise
     except Exception as e:
         # Log the error (in production, use proper logging)
         print(f"Error generating article: {str(e)}")
+        if owner:
+            await asyncio.to_thread(store.fail_job, job_id, str(e))
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error during article generation: {str(e)}"
         )
+    finally:
+        if heartbeat:
+            heartbeat.cancel()
 
 @app.get("/system-info")
 async def get_system_info():
@@ -158,18 +318,30 @@ async def get_system_info():
         "system": "Article Writing System",
         "version": "1.0.0",
         "workflow": "Write-Reflect with iterative improvement",
-        "max_iterations": 3,
-        "quality_threshold": 8,
+        "max_iterations": MAX_ITERATIONS,
+        "quality_threshold": QUALITY_THRESHOLD,
         "tools_available": [
             "fetch_readme - Load project README for context",
             "fetch_images - List available images for article inclusion"
         ],
         "model": os.getenv("BEDROCK_MODEL_ID", "Not configured"),
-        "aws_region": os.getenv("AWS_REGION", "Not configured")
+        "aws_region": os.getenv("AWS_REGION", "Not configured"),
+        "llm_provider": os.getenv("LLM_PROVIDER", "bedrock"),
+        "worker_pid": os.getpid(),
+        "shared_store": get_store().path
     }
 
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Counters shared by all workers. llm_calls_aborted (stopped mid-stream)
+    and llm_calls_avoided (never started) are the calls saved by
+    cancellation and deadlines.
+    """
+    return await asyncio.to_thread(get_store().get_metrics)
+
 @app.post("/test-generation")
-async def test_article_generation():
+async def test_article_generation(http_request: Request):
     """
     Test endpoint with a predefined example
     Useful for testing the system without providing custom input
@@ -179,14 +351,17 @@ async def test_article_generation():
         article_description="A comprehensive guide to building REST APIs with FastAPI, covering basic concepts, request/response models, dependency injection, and best practices."
     )
     
-    return await generate_article(test_request)
+    return await generate_article(test_request, http_request)
 
 if __name__ == "__main__":
-    # Run the server
+    # Run the server. With WORKERS > 1, worker processes share job state,
+    # the response cache and rate limits through the SQLite store.
+    workers = int(os.getenv("WORKERS", "1"))
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True,
+        port=int(os.getenv("PORT", "8000")),
+        reload=workers == 1,
+        workers=workers,
         log_level="info"
     )
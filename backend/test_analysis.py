@@ -0,0 +1,71 @@
+"""
+Test script for the local pre-reflection checks (no LLM calls needed)
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+from graph.analysis import analyze_article
+
+DESCRIPTION = "A short guide to Python syntax, data types and simple examples."
+
+def build_article(ending: str) -> str:
+    """Build a complete, well-structured article that ends with the given text"""
+    paragraph = "Python is a simple language. It is easy to read and write. " * 20
+    sections = ["Python Syntax", "Data Types", "Simple Examples", "Conclusion"]
+    body = "\n\n".join(f"## {heading}\n\n{paragraph.strip()}" for heading in sections)
+    return f"# Getting Started with Python\n\n{body}\n\n{ending}\n"
+
+def check(name, ending, expect_truncated, expect_passed):
+    """Analyze an article with the given ending and compare against expectations"""
+    analysis = analyze_article(build_article(ending), DESCRIPTION)
+    ok = analysis.truncated == expect_truncated and analysis.passed == expect_passed
+    status = "✅" if ok else "❌"
+    print(f"{status} {name}: truncated={analysis.truncated}, passed={analysis.passed}")
+    if not ok:
+        print(f"   Critical: {analysis.critical_issues}")
+        print(f"   Issues: {analysis.issues}")
+    return ok
+
+def test_analysis():
+    """Run the analyzer against common article endings"""
+    results = [
+        # Complete endings are not truncated
+        check("Sentence ending", "Thanks for reading.", False, True),
+        check("Emoji ending", "Happy coding 🚀", False, True),
+        check("Thematic break ending", "That is all for now.\n\n---", False, True),
+        check("No punctuation ending", "Thanks for reading", False, True),
+        check("Emoticon ending", "Thanks for reading :(", False, True),
+        check("Heading followed by a closed code block", "## Full Example\n\n```python\nprint('hello')\n```", False, True),
+        # Strong truncation signals are critical
+        check("Unclosed code fence", "```python\nprint('hello')", True, False),
+        check("Dangling heading", "## Next Steps", True, False),
+        check("Dangling list marker", "- First step\n-", True, False),
+        check("Unbalanced brackets", "See the [official docs](https://docs.python.org", True, False),
+    ]
+
+    # The writer's max_tokens stop reason is always treated as truncation
+    analysis = analyze_article(build_article("Thanks for reading."), DESCRIPTION, hit_token_limit=True)
+    limit_ok = analysis.truncated and not analysis.passed
+    print(f"{'✅' if limit_ok else '❌'} Token limit stop reason marks the article as truncated")
+    results.append(limit_ok)
+
+    # A missing final punctuation mark is reported as a minor issue only
+    analysis = analyze_article(build_article("Thanks for reading"), DESCRIPTION)
+    minor_ok = any("closing punctuation" in issue for issue in analysis.issues)
+    print(f"{'✅' if minor_ok else '❌'} Missing punctuation reported as a minor issue")
+    results.append(minor_ok)
+
+    # An article far below the target length fails
+    analysis = analyze_article("# Title\n\n## Intro\n\nToo short.", DESCRIPTION)
+    short_ok = not analysis.passed
+    print(f"{'✅' if short_ok else '❌'} Very short article fails the checks")
+    results.append(short_ok)
+
+    print("-" * 50)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    assert all(results), f"{len(results) - sum(results)} analysis check(s) failed"
+
+if __name__ == "__main__":
+    test_analysis()
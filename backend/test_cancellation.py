@@ -0,0 +1,114 @@
+"""
+Test script for deadline and cancellation handling (no LLM calls needed)
+"""
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SHARED_STORE_PATH", os.path.join(tempfile.mkdtemp(), "store.sqlite3"))
+
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from graph.cancellation import CancellationToken, GenerationCancelled
+from graph.drafts import DraftTracker
+from graph.fake_llm import FakeArticleModel
+from graph.helpers import generate_with_continuation
+from graph.store import SharedRateLimiter, get_store
+
+class StreamWatcher:
+    """Wraps a model and records whether its stream was closed"""
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.closed = False
+
+    def stream(self, messages, **kwargs):
+        try:
+            yield from self.llm.stream(messages, **kwargs)
+        except GeneratorExit:
+            self.closed = True
+            raise
+
+def check(name, ok):
+    """Print and return the result of a single check"""
+    print(f"{'✅' if ok else '❌'} {name}")
+    return ok
+
+def counter(name):
+    return get_store().get_metrics().get(name, 0)
+
+def raises_cancelled(func):
+    """Whether func raises GenerationCancelled"""
+    try:
+        func()
+    except GenerationCancelled:
+        return True
+    return False
+
+def test_cancellation():
+    """Run the draft ranking and cancellation checks"""
+    results = []
+    prompt = [SystemMessage(content="Article Name: Test\nArticle Description: Test"), HumanMessage(content="Write the article")]
+
+    # A draft that passed the local checks but was not reviewed yet beats
+    # one that failed them, whatever the failed draft's score
+    tracker = DraftTracker({"article_name": "Test"})
+    tracker.record("write", {"article_content": "first draft", "output_truncated": True})
+    tracker.record("analyze", {"analysis_passed": False, "quality_score": 3, "improvements": ["Finish the article"]})
+    tracker.record("write", {"article_content": "second draft", "output_truncated": False})
+    tracker.record("analyze", {"analysis_passed": True})
+    results.append(check("Unreviewed passed draft beats a failed draft", tracker.best_state()["article_content"] == "second draft"))
+    tracker.record("reflect", {"quality_score": 6, "improvements": []})
+    tracker.record("write", {"article_content": "third draft", "output_truncated": True})
+    tracker.record("analyze", {"analysis_passed": False, "quality_score": 3, "improvements": []})
+    best = tracker.best_state()
+    results.append(check("Reviewed passed draft beats a later failed draft",
+                         best["article_content"] == "second draft" and best["quality_score"] == 6))
+    results.append(check("Latest state is kept for a finished run", tracker.state()["article_content"] == "third draft"))
+
+    # Cancelled before the call: nothing is sent to the model
+    token = CancellationToken()
+    token.cancel("client disconnected")
+    avoided = counter("llm_calls_avoided")
+    results.append(check("Cancelled token stops the call",
+                         raises_cancelled(lambda: generate_with_continuation(FakeArticleModel(latency=0), prompt, cancel_token=token))))
+    results.append(check("Call avoided is counted", counter("llm_calls_avoided") == avoided + 1))
+
+    # Cancelled mid-stream: the stream is closed and the call counted as aborted
+    token = CancellationToken()
+    model = StreamWatcher(FakeArticleModel(latency=0.5, chunk_size=50))
+    chunks = []
+
+    def on_chunk(text):
+        chunks.append(text)
+        if len(chunks) == 2:
+            token.cancel("client disconnected")
+
+    aborted = counter("llm_calls_aborted")
+    results.append(check("Cancelling mid-stream stops the call",
+                         raises_cancelled(lambda: generate_with_continuation(model, prompt, on_chunk=on_chunk, cancel_token=token))))
+    results.append(check("Call aborted is counted", counter("llm_calls_aborted") == aborted + 1))
+    results.append(check("Stream is closed", model.closed and len(chunks) == 2))
+
+    # A deadline works the same way as an explicit cancel
+    token = CancellationToken(deadline_seconds=0.05)
+    results.append(check("Deadline stops the call",
+                         raises_cancelled(lambda: generate_with_continuation(FakeArticleModel(latency=1, chunk_size=50), prompt, cancel_token=token))))
+    results.append(check("Deadline is the cancel reason", token.reason == "deadline exceeded"))
+
+    # A call waiting on the rate limiter gives up when its token is cancelled
+    limiter = SharedRateLimiter(get_store(), "test_calls", limit=1, check_every=0.01)
+    limiter.acquire()
+    token = CancellationToken(deadline_seconds=0.1)
+    avoided = counter("llm_calls_avoided")
+    results.append(check("Rate limiter wait stops on the deadline",
+                         raises_cancelled(lambda: generate_with_continuation(FakeArticleModel(latency=0, rate_limiter=limiter), prompt, cancel_token=token))))
+    results.append(check("Call dropped by the rate limiter is counted", counter("llm_calls_avoided") == avoided + 1))
+
+    print("-" * 50)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    assert all(results), f"{len(results) - sum(results)} cancellation check(s) failed"
+
+if __name__ == "__main__":
+    test_cancellation()
@@ -0,0 +1,81 @@
+"""
+Test script for max_tokens continuation in the write chain (no LLM calls needed)
+"""
+import json
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SHARED_STORE_PATH", os.path.join(tempfile.mkdtemp(), "store.sqlite3"))
+
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+
+from graph import chains
+from graph.chains import _close_truncated_json
+from graph.helpers import generate_with_continuation, MAX_OUTPUT_TOKENS
+
+class ScriptedModel:
+    """Stand-in model whose stream() replays scripted (text, stop_reason) responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def stream(self, messages, **kwargs):
+        self.calls.append({"messages": list(messages), "kwargs": kwargs})
+        text, stop_reason = self.responses.pop(0)
+        yield AIMessageChunk(content=text)
+        yield AIMessageChunk(content="", response_metadata={"stop_reason": stop_reason})
+
+def check(name, ok):
+    """Print and return the result of a single check"""
+    print(f"{'✅' if ok else '❌'} {name}")
+    return ok
+
+def test_continuation():
+    """Run the continuation helper against scripted model responses"""
+    results = []
+    prompt = [HumanMessage(content="Write the article")]
+
+    # A response cut off by max_tokens is continued by prefilling the partial output
+    model = ScriptedModel([('{"article": "Hello ', "max_tokens"), ('world."}', "end_turn")])
+    text, stop_reason = generate_with_continuation(model, prompt, token_budget=3 * MAX_OUTPUT_TOKENS)
+    prefill = model.calls[1]["messages"][-1]
+    results.append(check("Continuation appends to the partial output", text == '{"article": "Helloworld."}'))
+    results.append(check("Continuation prefills the stripped partial output",
+                         isinstance(prefill, AIMessage) and prefill.content == '{"article": "Hello'))
+    results.append(check("Finished response reports its stop reason", stop_reason == "end_turn" and len(model.calls) == 2))
+
+    # The last call only asks for what is left of the budget
+    model = ScriptedModel([("a", "max_tokens"), ("b", "max_tokens")])
+    text, stop_reason = generate_with_continuation(model, prompt, token_budget=MAX_OUTPUT_TOKENS + 2000)
+    results.append(check("First call uses the default max_tokens", model.calls[0]["kwargs"] == {}))
+    results.append(check("Last call is capped to the remaining budget", model.calls[1]["kwargs"] == {"max_tokens": 2000}))
+    results.append(check("Exhausted budget reports max_tokens", text == "ab" and stop_reason == "max_tokens"))
+
+    # A JSON response cut mid-string is closed so it can still be parsed
+    results.append(check("Truncated JSON is closed", json.loads(_close_truncated_json('{"article": "abc')) == {"article": "abc"}))
+    results.append(check("Dangling escape is dropped", json.loads(_close_truncated_json('{"article": "abc\\')) == {"article": "abc"}))
+
+    # The write chain exposes the truncation to the graph
+    original_get_chat_model = chains.get_chat_model
+    chains.get_chat_model = lambda: ScriptedModel([('{"article": "# Partial', "max_tokens")] + [(" article", "max_tokens")] * 10)
+    try:
+        output = chains.write_chain().invoke({
+            "article_name": "Test",
+            "article_description": "Test",
+            "iteration_count": 0,
+            "improvements_context": ""
+        })
+    finally:
+        chains.get_chat_model = original_get_chat_model
+    results.append(check("Write chain sets output_truncated", output["output_truncated"] is True))
+    results.append(check("Write chain still parses the partial article", output["response"].article.startswith("# Partial")))
+
+    print("-" * 50)
+    print(f"{sum(results)}/{len(results)} checks passed")
+    assert all(results), f"{len(results) - sum(results)} continuation check(s) failed"
+
+if __name__ == "__main__":
+    test_continuation()